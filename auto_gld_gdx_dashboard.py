@@ -1,10 +1,15 @@
 import os
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import alpaca_trade_api as tradeapi
+from utils_cache import cached_yf_download
+from utils_features import build_feature_frame, compute_features
+from utils_log import append_log, read_log
+from utils_orders import describe_order, fill_event, filled_quantities, submit_orders
+from utils_streamlit import script_run_executor
 
 st.set_page_config(page_title="GLD/GDX Auto-Trader", layout="wide")
 st.title("GLD/GDX Arbitrage Automated Trading Dashboard")
@@ -31,26 +36,21 @@ if not API_KEY or not SECRET_KEY:
 # --- Helper functions ---
 @st.cache_data(ttl=600)
 def get_latest_data():
-    df = yf.download([GLD_TICKER, GDX_TICKER], period=f"{LOOKBACK+1}d", interval="1d")
-    price = df['Close'].dropna()
-    vol = df['Volume'].dropna()
-    price.columns = ['GLD', 'GDX']
-    vol.columns = ['GLD_vol', 'GDX_vol']
-    df = price.join(vol)
-    df['GLD_ret'] = df['GLD'].pct_change()
-    df['GDX_ret'] = df['GDX'].pct_change()
-    df['GLD_gap'] = df['GLD'].pct_change()
-    df['RVOL'] = df['GLD_vol'] / df['GLD_vol'].rolling(LOOKBACK).mean()
-    df['Spread'] = df['GLD'] - df['GDX']
-    df['ZScore'] = (df['Spread'] - df['Spread'].rolling(LOOKBACK).mean()) / df['Spread'].rolling(LOOKBACK).std()
-    df['GLD_volatility'] = df['GLD_ret'].rolling(LOOKBACK).std()
-    df['GDX_volatility'] = df['GDX_ret'].rolling(LOOKBACK).std()
-    return df.dropna()
-
-def get_alpaca_api():
-    if not API_KEY or not SECRET_KEY:
-        return None
-    return tradeapi.REST(API_KEY, SECRET_KEY, BASE_URL, api_version='v2')
+    df = cached_yf_download([GLD_TICKER, GDX_TICKER], period=f"{LOOKBACK+1}d", interval="1d", ttl=600)
+    return build_feature_frame(df, LOOKBACK, GLD_TICKER, GDX_TICKER)
+
+@st.cache_resource
+def _warmup():
+    # Compile the Numba feature kernel once per process, before the first render needs it
+    steps = np.arange(LOOKBACK + 5, dtype=np.float64)
+    compute_features(100.0 + steps, 30.0 + 0.5 * steps, 1_000_000.0 + steps, LOOKBACK)
+    return True
+
+_warmup()
+
+@st.cache_resource
+def get_alpaca_api(api_key, secret_key, base_url):
+    return tradeapi.REST(api_key, secret_key, base_url, api_version='v2')
 
 def get_open_position(api):
     try:
@@ -63,44 +63,53 @@ def get_open_position(api):
         return [], []
 
 def log_action(action, details=""):
-    ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-    line = f"{ts},{action},{details}\n"
-    with open("trade_system_log.csv", "a") as f:
-        f.write(line)
+    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    append_log("trade_system_log", {"Timestamp": ts, "Action": action, "Details": str(details)})
 
 def log_trade(event, qty_gld, qty_gdx, price_gld, price_gdx):
-    ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-    line = f"{ts},{event},{qty_gld},{qty_gdx},{price_gld},{price_gdx}\n"
-    with open("trade_log.csv", "a") as f:
-        f.write(line)
+    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    append_log("trade_log", {
+        "Timestamp": ts, "Event": event, "Qty_GLD": int(qty_gld), "Qty_GDX": int(qty_gdx),
+        "GLD_Price": float(price_gld), "GDX_Price": float(price_gdx)
+    })
+
+def run_orders(api, orders, action, error_label):
+    errors = submit_orders(api, orders)
+    for order, err in zip(orders, errors):
+        if err is None:
+            log_action(action, describe_order(order))
+        else:
+            st.error(f"{error_label} ({describe_order(order)}): {err}")
+            log_action(f"{action}_FAILED", f"{describe_order(order)}: {err}")
+    return filled_quantities(orders, errors)
 
 def place_trade(api, qty_gld, qty_gdx):
-    try:
-        api.submit_order(symbol=GLD_TICKER, qty=qty_gld, side="buy", type="market", time_in_force="gtc")
-        api.submit_order(symbol=GDX_TICKER, qty=qty_gdx, side="sell", type="market", time_in_force="gtc")
-        log_action("TRADE_OPEN", f"BUY {qty_gld} GLD, SELL {qty_gdx} GDX")
+    orders = [
+        dict(symbol=GLD_TICKER, qty=qty_gld, side="buy"),
+        dict(symbol=GDX_TICKER, qty=qty_gdx, side="sell"),
+    ]
+    filled = run_orders(api, orders, "TRADE_OPEN", "Order error")
+    if filled == [qty_gld, qty_gdx]:
         st.success(f"Orders sent: BUY {qty_gld} {GLD_TICKER}, SELL {qty_gdx} {GDX_TICKER}")
-    except Exception as e:
-        st.error(f"Order error: {e}")
-        log_action("TRADE_OPEN_FAILED", str(e))
+    return filled
 
 def close_trade(api, qty_gld, qty_gdx):
-    try:
-        api.submit_order(symbol=GLD_TICKER, qty=qty_gld, side="sell", type="market", time_in_force="gtc")
-        api.submit_order(symbol=GDX_TICKER, qty=qty_gdx, side="buy", type="market", time_in_force="gtc")
-        log_action("TRADE_CLOSE", f"SELL {qty_gld} GLD, BUY {qty_gdx} GDX")
+    orders = [
+        dict(symbol=GLD_TICKER, qty=qty_gld, side="sell"),
+        dict(symbol=GDX_TICKER, qty=qty_gdx, side="buy"),
+    ]
+    filled = run_orders(api, orders, "TRADE_CLOSE", "Close order error")
+    if filled == [qty_gld, qty_gdx]:
         st.success(f"Closing trade: SELL {qty_gld} {GLD_TICKER}, BUY {qty_gdx} {GDX_TICKER}")
-    except Exception as e:
-        st.error(f"Close order error: {e}")
-        log_action("TRADE_CLOSE_FAILED", str(e))
+    return filled
 
 # --- Signal & sizing logic ---
-def check_signal(row):
+def signal_series(df):
     return (
-        (row['GLD_gap'] > GAP_THRESHOLD) and
-        (row['GDX_ret'] < row['GLD_ret'] / 2) and
-        (row['RVOL'] > VOLUME_MULTIPLIER) and
-        (row['ZScore'] > 1)
+        (df['GLD_gap'] > GAP_THRESHOLD) &
+        (df['GDX_ret'] < df['GLD_ret'] / 2) &
+        (df['RVOL'] > VOLUME_MULTIPLIER) &
+        (df['ZScore'] > 1)
     )
 
 def compute_sizing(row):
@@ -115,25 +124,33 @@ def compute_sizing(row):
     return qty_gld, qty_gdx, scale
 
 # --- Dashboard UI ---
-data = get_latest_data()
+api = get_alpaca_api(API_KEY, SECRET_KEY, BASE_URL) if (API_KEY and SECRET_KEY) else None
+
+# Price download and positions fetch overlap on worker threads
+with script_run_executor(2) as ex:
+    data_future = ex.submit(get_latest_data)
+    positions_future = ex.submit(get_open_position, api) if api else None
+    data = data_future.result()
+    gld_pos, gdx_pos = positions_future.result() if positions_future else ([], [])
+
 row = data.iloc[-1]
 today = data.index[-1]
 
-signal = check_signal(row)
+signals = signal_series(data)
+signal = bool(signals.iloc[-1])
 qty_gld, qty_gdx, scale = compute_sizing(row)
 
 st.write(f"Latest date: {today.date()} | GLD: ${row['GLD']:.2f} | GDX: ${row['GDX']:.2f}")
 st.write(f"Signal: {'✅' if signal else '❌'}, Sizing scale: {scale:.2f}, Qty GLD: {qty_gld}, Qty GDX: {qty_gdx}")
 
-api = get_alpaca_api() if (API_KEY and SECRET_KEY) else None
-gld_pos, gdx_pos = get_open_position(api) if api else ([], [])
-
 # --- Buttons ---
 if signal and not (gld_pos and gdx_pos):
     if st.button(f"Open Trade (BUY {qty_gld} GLD, SELL {qty_gdx} GDX)"):
         if api:
-            place_trade(api, qty_gld, qty_gdx)
-            log_trade("open", qty_gld, qty_gdx, row['GLD'], row['GDX'])
+            filled_gld, filled_gdx = place_trade(api, qty_gld, qty_gdx)
+            event = fill_event("open", [filled_gld, filled_gdx], [qty_gld, qty_gdx])
+            if event:
+                log_trade(event, filled_gld, filled_gdx, row['GLD'], row['GDX'])
         else:
             st.warning("No Alpaca API key/secret.")
 
@@ -141,15 +158,18 @@ if gld_pos and gdx_pos:
     # Ideally store persistent time of open; for now, just always allow closing
     if st.button(f"Close Trade (SELL {gld_pos[0].qty} GLD, BUY {gdx_pos[0].qty} GDX)"):
         if api:
-            close_trade(api, int(float(gld_pos[0].qty)), int(float(gdx_pos[0].qty)))
-            log_trade("close", int(float(gld_pos[0].qty)), int(float(gdx_pos[0].qty)), row['GLD'], row['GDX'])
+            qty_gld_open, qty_gdx_open = int(float(gld_pos[0].qty)), int(float(gdx_pos[0].qty))
+            filled_gld, filled_gdx = close_trade(api, qty_gld_open, qty_gdx_open)
+            event = fill_event("close", [filled_gld, filled_gdx], [qty_gld_open, qty_gdx_open])
+            if event:
+                log_trade(event, filled_gld, filled_gdx, row['GLD'], row['GDX'])
         else:
             st.warning("No Alpaca API key/secret.")
 
 # --- Trade Log Display ---
 st.subheader("Trade Log")
 try:
-    trade_log = pd.read_csv("trade_log.csv", names=["Timestamp", "Event", "Qty_GLD", "Qty_GDX", "GLD_Price", "GDX_Price"])
+    trade_log = read_log("trade_log", ["Timestamp", "Event", "Qty_GLD", "Qty_GDX", "GLD_Price", "GDX_Price"])
     st.dataframe(trade_log.tail(20), use_container_width=True)
 except Exception:
     st.info("No trades logged yet.")
@@ -157,7 +177,7 @@ except Exception:
 # --- System Log Display ---
 st.subheader("System Log")
 try:
-    sys_log = pd.read_csv("trade_system_log.csv", names=["Timestamp", "Action", "Details"])
+    sys_log = read_log("trade_system_log", ["Timestamp", "Action", "Details"])
     st.dataframe(sys_log.tail(20), use_container_width=True)
 except Exception:
     st.info("No system log yet.")
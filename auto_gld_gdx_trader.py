@@ -1,11 +1,14 @@
 import os
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta, timezone
 import alpaca_trade_api as tradeapi
 import time
 import sys
+from utils_cache import cached_yf_download
+from utils_features import add_features, price_frame
+from utils_log import append_log
+from utils_orders import describe_order, fill_event, filled_quantities, submit_orders
 
 # Load Alpaca credentials from environment variables or your secrets manager
 API_KEY = os.getenv("APCA_API_KEY_ID")
@@ -25,9 +28,9 @@ HOLD_DAYS = 1  # 1-day hold
 
 api = tradeapi.REST(API_KEY, SECRET_KEY, BASE_URL, api_version='v2')
 
-def get_latest_data():
+def get_price_data():
     # Download last 21 days to get 20-day rolling stats
-    df = yf.download([GLD_TICKER, GDX_TICKER], period=f"{LOOKBACK+1}d", interval="1d")
+    df = cached_yf_download([GLD_TICKER, GDX_TICKER], period=f"{LOOKBACK+1}d", interval="1d", ttl=600)
     
     # Check for failed download or empty DataFrame
     if df.empty or df.isnull().all().all() or 'Close' not in df or 'Volume' not in df:
@@ -35,20 +38,7 @@ def get_latest_data():
         print(df)
         sys.exit(1)
         
-    price = df['Close'].dropna()
-    vol = df['Volume'].dropna()
-    price.columns = ['GLD', 'GDX']
-    vol.columns = ['GLD_vol', 'GDX_vol']
-    df = price.join(vol)
-    df['GLD_ret'] = df['GLD'].pct_change()
-    df['GDX_ret'] = df['GDX'].pct_change()
-    df['GLD_gap'] = df['GLD'].pct_change()
-    df['RVOL'] = df['GLD_vol'] / df['GLD_vol'].rolling(LOOKBACK).mean()
-    df['Spread'] = df['GLD'] - df['GDX']
-    df['ZScore'] = (df['Spread'] - df['Spread'].rolling(LOOKBACK).mean()) / df['Spread'].rolling(LOOKBACK).std()
-    df['GLD_volatility'] = df['GLD_ret'].rolling(LOOKBACK).std()
-    df['GDX_volatility'] = df['GDX_ret'].rolling(LOOKBACK).std()
-    return df.dropna()
+    return price_frame(df, GLD_TICKER, GDX_TICKER)
 
 def get_open_position():
     try:
@@ -60,51 +50,67 @@ def get_open_position():
         print("Error fetching positions:", e)
         return [], []
 
+def log_trade(ts, event, qty_gld, qty_gdx, price_gld, price_gdx):
+    append_log("live_trade_log", {
+        "Timestamp": str(ts), "Event": event, "Qty_GLD": int(qty_gld), "Qty_GDX": int(qty_gdx),
+        "GLD_Price": float(price_gld), "GDX_Price": float(price_gdx)
+    })
+
+def run_orders(orders, error_label):
+    errors = submit_orders(api, orders)
+    for order, err in zip(orders, errors):
+        if err is not None:
+            print(f"{error_label} ({describe_order(order)}):", err)
+    return filled_quantities(orders, errors)
+
 def place_trade(qty_gld, qty_gdx):
     # Place orders: buy GLD, sell GDX (short)
-    try:
-        # Place GLD BUY
-        api.submit_order(
-            symbol=GLD_TICKER, qty=qty_gld, side="buy",
-            type="market", time_in_force="gtc"
-        )
-        # Place GDX SELL (short)
-        api.submit_order(
-            symbol=GDX_TICKER, qty=qty_gdx, side="sell",
-            type="market", time_in_force="gtc"
-        )
+    orders = [
+        dict(symbol=GLD_TICKER, qty=qty_gld, side="buy"),
+        dict(symbol=GDX_TICKER, qty=qty_gdx, side="sell"),
+    ]
+    filled = run_orders(orders, "Order error")
+    if filled == [qty_gld, qty_gdx]:
         print(f"Orders sent: BUY {qty_gld} {GLD_TICKER}, SELL {qty_gdx} {GDX_TICKER}")
-    except Exception as e:
-        print("Order error:", e)
+    return filled
 
 def close_trade(qty_gld, qty_gdx):
     # Close both legs (sell GLD, buy to cover GDX)
-    try:
-        api.submit_order(
-            symbol=GLD_TICKER, qty=qty_gld, side="sell",
-            type="market", time_in_force="gtc"
-        )
-        api.submit_order(
-            symbol=GDX_TICKER, qty=qty_gdx, side="buy",
-            type="market", time_in_force="gtc"
-        )
+    orders = [
+        dict(symbol=GLD_TICKER, qty=qty_gld, side="sell"),
+        dict(symbol=GDX_TICKER, qty=qty_gdx, side="buy"),
+    ]
+    filled = run_orders(orders, "Close order error")
+    if filled == [qty_gld, qty_gdx]:
         print(f"Closing trade: SELL {qty_gld} {GLD_TICKER}, BUY {qty_gdx} {GDX_TICKER}")
-    except Exception as e:
-        print("Close order error:", e)
+    return filled
 
 def main():
-    df = get_latest_data()
-    today = df.index[-1]
-    row = df.iloc[-1]
+    prices = get_price_data()
+    today = prices.index[-1]
+    row = prices.iloc[-1]
     print(f"Latest date: {today.date()} | Price GLD: {row['GLD']} | GDX: {row['GDX']}")
 
-    # Signal logic (match research)
-    signal = (
-        (row['GLD_gap'] > GAP_THRESHOLD) and
-        (row['GDX_ret'] < row['GLD_ret'] / 2) and
-        (row['RVOL'] > VOLUME_MULTIPLIER) and
-        (row['ZScore'] > 1)
-    )
+    # The gap and RVOL are the cheapest predicates; only build the rolling features when both pass
+    gld_close = prices['GLD'].to_numpy()
+    gld_vol = prices['GLD_vol'].to_numpy()
+    gap = gld_close[-1] / gld_close[-2] - 1 if len(gld_close) > 1 else np.nan
+    # Only today's RVOL is used, so take the trailing mean instead of a full rolling series.
+    # The return volatilities need LOOKBACK returns, i.e. LOOKBACK + 1 closes, so require that many rows.
+    rvol = float(gld_vol[-1] / gld_vol[-LOOKBACK:].mean()) if len(gld_vol) > LOOKBACK else np.nan
+    signal = False
+    if gap > GAP_THRESHOLD and rvol > VOLUME_MULTIPLIER:
+        df = add_features(prices, LOOKBACK)
+        # dropna() can still drop today's row (e.g. a zero-variance window); treat that as no signal
+        if not df.empty and df.index[-1] == today:
+            row = df.iloc[-1]
+            # Signal logic (match research)
+            signal = (
+                (row['GLD_gap'] > GAP_THRESHOLD) and
+                (row['GDX_ret'] < row['GLD_ret'] / 2) and
+                (rvol > VOLUME_MULTIPLIER) and
+                (row['ZScore'] > 1)
+            )
 
     gld_pos, gdx_pos = get_open_position()
     have_open_trade = bool(gld_pos and gdx_pos)
@@ -121,19 +127,21 @@ def main():
         qty_gld = int(notional / row['GLD'])
         qty_gdx = int(notional / row['GDX'])
         print(f"Signal detected: placing trade with scale {scale:.2f}, {qty_gld} GLD, {qty_gdx} GDX")
-        place_trade(qty_gld, qty_gdx)
-        # Log trade
-        with open("live_trade_log.csv", "a") as f:
-            f.write(f"{today},{'open'},{qty_gld},{qty_gdx},{row['GLD']},{row['GDX']}\n")
+        filled_gld, filled_gdx = place_trade(qty_gld, qty_gdx)
+        # Log only what was filled; a one-sided fill is logged as open_partial
+        event = fill_event("open", [filled_gld, filled_gdx], [qty_gld, qty_gdx])
+        if event:
+            log_trade(today, event, filled_gld, filled_gdx, row['GLD'], row['GDX'])
     elif have_open_trade:
         # Check if time to close (e.g., after HOLD_DAYS)
         opened_at = datetime.strptime(gld_pos[0].asset_class, "%Y-%m-%d") if hasattr(gld_pos[0], 'asset_class') else today - timedelta(days=HOLD_DAYS)
         if (today - opened_at).days >= HOLD_DAYS:
             qty_gld = int(float(gld_pos[0].qty))
             qty_gdx = int(float(gdx_pos[0].qty))
-            close_trade(qty_gld, qty_gdx)
-            with open("live_trade_log.csv", "a") as f:
-                f.write(f"{today},{'close'},{qty_gld},{qty_gdx},{row['GLD']},{row['GDX']}\n")
+            filled_gld, filled_gdx = close_trade(qty_gld, qty_gdx)
+            event = fill_event("close", [filled_gld, filled_gdx], [qty_gld, qty_gdx])
+            if event:
+                log_trade(today, event, filled_gld, filled_gdx, row['GLD'], row['GDX'])
         else:
             print("Trade open, waiting to close.")
     else:
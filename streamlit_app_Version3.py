@@ -15,11 +15,13 @@ import streamlit as st
 
 st.set_page_config(page_title="GLD/GDX Arb Tracker", layout="wide")
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime
+from utils_cache import cached_yf_download
+from utils_features import rolling_mean_std
+from utils_streamlit import script_run_executor
 
 st.title("GLD/GDX Arbitrage Strategy Dashboard")
 
@@ -34,37 +36,66 @@ API_KEY = st.secrets.get("API_KEY", "")
 SECRET_KEY = st.secrets.get("SECRET_KEY", "")
 BASE_URL = st.secrets.get("BASE_URL", "https://paper-api.alpaca.markets")
 
+# --- ALPACA CLIENT ---
+@st.cache_resource
+def get_alpaca_api(api_key, secret_key, base_url):
+    import alpaca_trade_api as tradeapi
+    return tradeapi.REST(api_key, secret_key, base_url, api_version='v2')
+
 # --- LOAD PRICE DATA ---
 @st.cache_data
 def load_price_data(lead, lag, capital):
-    lead_series = yf.Ticker(lead).history(period="90d")["Close"]
-    lag_series = yf.Ticker(lag).history(period="90d")["Close"]
-    if lead_series.empty or lag_series.empty:
+    prices = cached_yf_download([lead, lag], period="90d")
+    if prices.empty or "Close" not in prices:
+        return pd.DataFrame()
+    df = prices["Close"][[lead, lag]].dropna(how="all")
+    if df[lead].isna().all() or df[lag].isna().all():
         return pd.DataFrame()
-    df = pd.DataFrame({lead: lead_series, lag: lag_series})
     df['Spread'] = df[lead] - df[lag]
-    df['ZScore'] = (df['Spread'] - df['Spread'].rolling(20).mean()) / df['Spread'].rolling(20).std()
+    spread_mean, spread_std = rolling_mean_std(df['Spread'], 20)
+    df['ZScore'] = (df['Spread'] - spread_mean) / spread_std
     df['Equity'] = capital * (1 + df['ZScore'].fillna(0) * 0.01).cumprod()  # Simulated equity path
     return df
 
+# --- LOAD ALPACA POSITIONS ---
+# Returns (positions_df, error); no Streamlit calls so it can run on a worker thread
+def fetch_positions():
+    try:
+        api = get_alpaca_api(API_KEY, SECRET_KEY, BASE_URL)
+        positions = api.list_positions()
+        positions_df = pd.DataFrame([{
+            "symbol": p.symbol,
+            "qty": float(p.qty),
+            "side": p.side,
+            "market_value": float(p.market_value),
+            "unrealized_pl": float(p.unrealized_pl)
+        } for p in positions])
+        return positions_df, None
+    except Exception as e:
+        return pd.DataFrame(), e
+
 # --- LOAD TRADE LOG ---
+# mtime is only a cache key so a new trades_hold1.csv is re-read
 @st.cache_data
-def load_trade_log():
+def load_trade_log(mtime):
     try:
-        return pd.read_csv("trades_hold1.csv")
+        trades = pd.read_csv("trades_hold1.csv")
+        trades["Entry Date"] = pd.to_datetime(trades["Entry Date"], cache=True)
+        return trades
     except Exception as e:
         print("Failed to load trade log:", e)
         return pd.DataFrame(columns=["Entry Date", "Exit Date", "GLD Return", "GDX Return", "Net Return", "Scaled Return", "Leverage"])
 
 # --- PLOT SIGNAL CHART ---
-def plot_signal_chart(df):
+@st.cache_data
+def plot_signal_chart(df, signal, trades):
     if df.empty:
         return go.Figure()
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=df.index, y=df[LEAD], mode='lines', name=LEAD))
     fig.add_trace(go.Scatter(x=df.index, y=df[LAG], mode='lines', name=LAG))
     # Signal overlay (ZScore > 1)
-    signal_points = df[df['ZScore'] > 1]
+    signal_points = df[signal]
     fig.add_trace(go.Scatter(
         x=signal_points.index,
         y=signal_points[LEAD],
@@ -74,12 +105,14 @@ def plot_signal_chart(df):
     ))
     # Trade log overlay (if available)
     try:
-        trades = pd.read_csv("trades_hold1.csv")
-        trades["Entry Date"] = pd.to_datetime(trades["Entry Date"])
-        entries = trades.dropna(subset=["Entry Date"])
-        yvals = df.reindex(entries["Entry Date"])[LEAD]
+        entry_dates = trades["Entry Date"].dropna().values.astype("datetime64[ns]")
+        dates = df.index.values.astype("datetime64[ns]")
+        # Only entries inside the plotted window; searchsorted would pin the rest to the edges
+        entry_dates = entry_dates[(entry_dates >= dates[0]) & (entry_dates <= dates[-1])]
+        idx = np.clip(np.searchsorted(dates, entry_dates), 0, len(df) - 1)
+        yvals = df[LEAD].values[idx]
         fig.add_trace(go.Scatter(
-            x=entries["Entry Date"],
+            x=entry_dates,
             y=yvals,
             mode='markers',
             name='Trade Entry',
@@ -105,16 +138,25 @@ def plot_signal_chart(df):
     return fig
 
 # --- SHOW PRICE DATA ---
-data = load_price_data(LEAD, LAG, CAPITAL)
+alpaca_configured = bool(API_KEY and SECRET_KEY)
+with script_run_executor(2) as ex:
+    data_future = ex.submit(load_price_data, LEAD, LAG, CAPITAL)
+    positions_future = ex.submit(fetch_positions) if alpaca_configured else None
+    data = data_future.result()
+    positions_df, positions_error = positions_future.result() if positions_future else (pd.DataFrame(), None)
+
 if data.empty:
     st.error("Failed to download price data for GLD or GDX. Please try again later.")
     st.stop()
 
+trades_mtime = os.path.getmtime("trades_hold1.csv") if os.path.exists("trades_hold1.csv") else 0.0
+log = load_trade_log(trades_mtime)
+
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Equity Curve (Simulated)")
-    st.plotly_chart(plot_signal_chart(data), use_container_width=True)
+    st.plotly_chart(plot_signal_chart(data, data['ZScore'] > 1, log), use_container_width=True)
 
 with col2:
     st.subheader("Z-Score (GLD - GDX Spread)")
@@ -123,7 +165,6 @@ with col2:
 # --- SHOW RECENT TRADE LOG ---
 st.divider()
 st.subheader("📒 Recent Trades")
-log = load_trade_log()
 if not log.empty:
     st.dataframe(log.sort_values("Entry Date", ascending=False), use_container_width=True)
 else:
@@ -133,29 +174,13 @@ else:
 st.divider()
 st.subheader("📦 Open Positions (Alpaca)")
 
-positions_df = pd.DataFrame()
-alpaca_connected = False
-if API_KEY and SECRET_KEY:
-    try:
-        import alpaca_trade_api as tradeapi
-        api = tradeapi.REST(API_KEY, SECRET_KEY, BASE_URL, api_version='v2')
-        positions = api.list_positions()
-        positions_df = pd.DataFrame([{
-            "symbol": p.symbol,
-            "qty": float(p.qty),
-            "side": p.side,
-            "market_value": float(p.market_value),
-            "unrealized_pl": float(p.unrealized_pl)
-        } for p in positions])
-        alpaca_connected = True
-    except Exception as e:
-        st.info(f"Could not fetch Alpaca positions (check API keys and internet connection): {e}")
-else:
+if not alpaca_configured:
     st.info("Alpaca API keys not configured. Add them as Streamlit secrets to enable live positions.")
-
-if alpaca_connected and not positions_df.empty:
+elif positions_error is not None:
+    st.info(f"Could not fetch Alpaca positions (check API keys and internet connection): {positions_error}")
+elif not positions_df.empty:
     st.dataframe(positions_df, use_container_width=True)
-elif alpaca_connected:
+else:
     st.info("No open positions in Alpaca account.")
 
 # --- SHOW RECENT PRICES ---
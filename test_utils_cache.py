@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils_cache
+from utils_cache import cached_yf_download
+
+pytest.importorskip("pyarrow")
+
+
+def yf_frame(gdx_close=None):
+    index = pd.date_range("2024-01-02", periods=3, freq="B")
+    columns = pd.MultiIndex.from_product([["Close", "Volume"], ["GDX", "GLD"]], names=["Price", "Ticker"])
+    df = pd.DataFrame(np.arange(12, dtype=np.float64).reshape(3, 4), index=index, columns=columns)
+    if gdx_close is not None:
+        df[("Close", "GDX")] = gdx_close
+    return df
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frames = []
+    monkeypatch.setattr(utils_cache.yf, "download", lambda *args, **kwargs: frames.pop(0))
+    return frames
+
+
+def cache_files():
+    return os.listdir(utils_cache.CACHE_DIR) if os.path.isdir(utils_cache.CACHE_DIR) else []
+
+
+def test_complete_download_is_cached(downloads):
+    downloads.append(yf_frame())
+    first = cached_yf_download(["GLD", "GDX"], period="21d")
+    assert [f.endswith(".parquet") for f in cache_files()] == [True]
+    # Served from disk: no second download is queued
+    pd.testing.assert_frame_equal(cached_yf_download(["GLD", "GDX"], period="21d"), first, check_freq=False)
+
+
+def test_partial_failure_is_not_cached(downloads):
+    downloads.extend([yf_frame(gdx_close=np.nan), yf_frame()])
+    failed = cached_yf_download(["GLD", "GDX"], period="21d")
+    assert failed[("Close", "GDX")].isna().all()
+    assert cache_files() == []
+    assert not cached_yf_download(["GLD", "GDX"], period="21d")[("Close", "GDX")].isna().any()
+
+
+def test_empty_download_is_not_cached(downloads):
+    downloads.append(pd.DataFrame())
+    assert cached_yf_download("GLD", period="90d").empty
+    assert cache_files() == []
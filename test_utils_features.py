@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils_features
+from utils_features import compute_features
+
+LOOKBACK = 20
+
+
+def pandas_reference(gld_close, gdx_close, gld_vol, lookback):
+    gld = pd.Series(gld_close, dtype=np.float64)
+    gdx = pd.Series(gdx_close, dtype=np.float64)
+    vol = pd.Series(gld_vol, dtype=np.float64)
+    spread = gld - gdx
+    gld_ret = gld.pct_change()
+    gdx_ret = gdx.pct_change()
+    return (
+        gld_ret,
+        gdx_ret,
+        vol / vol.rolling(lookback).mean(),
+        (spread - spread.rolling(lookback).mean()) / spread.rolling(lookback).std(),
+        gld_ret.rolling(lookback).std(),
+        gdx_ret.rolling(lookback).std(),
+    )
+
+
+def random_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    gld = 180 + rng.standard_normal(n).cumsum()
+    gdx = 30 + 0.3 * rng.standard_normal(n).cumsum()
+    vol = rng.integers(5_000_000, 15_000_000, n).astype(np.float64)
+    return gld, gdx, vol
+
+
+def constant_inputs(n):
+    return np.full(n, 180.0), np.full(n, 30.0), np.full(n, 8_000_000.0)
+
+
+def zero_volume_inputs(n):
+    gld, gdx, _ = random_inputs(n)
+    return gld, gdx, np.zeros(n)
+
+
+CASES = {
+    "random": random_inputs(90),
+    "constant": constant_inputs(30),
+    "zero_volume": zero_volume_inputs(30),
+    **{f"short_{n}": random_inputs(n) for n in (0, 1, 5, LOOKBACK - 1, LOOKBACK, LOOKBACK + 1)},
+}
+
+IMPLEMENTATIONS = {
+    "compute_features": compute_features,
+    "python_loop": utils_features._features_loop,
+    "vectorized": utils_features._compute_features_vectorized,
+}
+
+
+@pytest.mark.parametrize("impl", IMPLEMENTATIONS.values(), ids=IMPLEMENTATIONS.keys())
+@pytest.mark.parametrize("inputs", CASES.values(), ids=CASES.keys())
+def test_features_match_pandas(impl, inputs):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = pandas_reference(*inputs, LOOKBACK)
+        result = impl(*inputs, LOOKBACK)
+    assert len(result) == len(expected)
+    for got, want in zip(result, expected):
+        np.testing.assert_allclose(got, want.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def yf_download_frame(n, seed=0):
+    gld, gdx, vol = random_inputs(n, seed)
+    index = pd.date_range("2024-01-02", periods=n, freq="B")
+    columns = pd.MultiIndex.from_product([["Close", "Volume"], ["GDX", "GLD"]], names=["Price", "Ticker"])
+    return pd.DataFrame(np.column_stack([gdx, gld, vol / 3, vol]), index=index, columns=columns)
+
+
+def test_build_feature_frame_keeps_only_warm_rows():
+    raw = yf_download_frame(LOOKBACK + 3)
+    df = utils_features.build_feature_frame(raw, LOOKBACK, "GLD", "GDX")
+    # LOOKBACK returns need LOOKBACK + 1 closes, so the first LOOKBACK rows are warm-up
+    assert list(df.index) == list(raw.index[LOOKBACK:])
+    assert not df.isna().any(axis=None)
+    expected = pandas_reference(raw[("Close", "GLD")], raw[("Close", "GDX")], raw[("Volume", "GLD")], LOOKBACK)
+    np.testing.assert_allclose(df["ZScore"], expected[3].to_numpy()[LOOKBACK:], rtol=1e-9)
+    np.testing.assert_array_equal(df["GLD_gap"], df["GLD_ret"])
+
+
+def test_build_feature_frame_drops_missing_bars():
+    raw = yf_download_frame(LOOKBACK + 3)
+    raw.iloc[5, raw.columns.get_loc(("Close", "GDX"))] = np.nan
+    prices = utils_features.price_frame(raw, "GLD", "GDX")
+    assert len(prices) == len(raw) - 1
+    assert utils_features.add_features(prices, LOOKBACK).index[-1] == raw.index[-1]
@@ -0,0 +1,100 @@
+import os
+
+import pandas as pd
+import pytest
+
+import utils_log
+from utils_log import append_log, read_log
+
+pytest.importorskip("pyarrow")
+
+TRADE_COLUMNS = ["Timestamp", "Event", "Qty_GLD", "Qty_GDX", "GLD_Price", "GDX_Price"]
+
+
+def trade(ts, event):
+    return {"Timestamp": ts, "Event": event, "Qty_GLD": 10, "Qty_GDX": 20, "GLD_Price": 180.5, "GDX_Price": 30.25}
+
+
+def test_rows_in_same_second_keep_write_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for i in range(5):
+        append_log("sys_log", {"Timestamp": "2024-01-02 10:00:00", "Action": f"A{i}", "Details": ""})
+    df = read_log("sys_log", ["Timestamp", "Action", "Details"])
+    assert list(df["Action"]) == [f"A{i}" for i in range(5)]
+
+
+def test_one_file_per_day(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for ts in ["2024-01-02 10:00:00", "2024-01-02 11:00:00", "2024-01-03 09:00:00"]:
+        append_log("trade_log", trade(ts, "open"))
+    files = sorted(
+        os.path.relpath(os.path.join(root, f), "trade_log")
+        for root, _, names in os.walk("trade_log") for f in names
+    )
+    assert files == [os.path.join("date=2024-01-02", "part.parquet"), os.path.join("date=2024-01-03", "part.parquet")]
+    assert len(read_log("trade_log", TRADE_COLUMNS)) == 3
+
+
+def test_legacy_csv_rows_come_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("trade_log.csv", "w") as f:
+        f.write("2023-12-29 10:00:00,open,1,2,170.0,28.0\n")
+        f.write("2023-12-29 10:00:01,close,1,2,171.0,28.5\n")
+    append_log("trade_log", trade("2024-01-02 10:00:00", "open"))
+    df = read_log("trade_log", TRADE_COLUMNS)
+    assert list(df["Timestamp"]) == ["2023-12-29 10:00:00", "2023-12-29 10:00:01", "2024-01-02 10:00:00"]
+    assert list(df["Event"]) == ["open", "close", "open"]
+
+
+def test_csv_fallback_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils_log, "pa", None)
+    monkeypatch.setattr(utils_log, "pq", None)
+    append_log("sys_log", {"Timestamp": "2024-01-02 10:00:00", "Action": "A", "Details": "x"})
+    df = read_log("sys_log", ["Timestamp", "Action", "Details"])
+    assert list(df["Action"]) == ["A"]
+    assert not os.path.isdir("sys_log")
+
+
+def test_missing_log_raises(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        read_log("trade_log", TRADE_COLUMNS)
+
+
+def test_legacy_system_log_with_comma_in_details(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Exactly what the baseline log_action wrote for an opened trade
+    with open("trade_system_log.csv", "w") as f:
+        f.write("2024-01-02 15:00:00,TRADE_OPEN,BUY 10 GLD, SELL 20 GDX\n")
+        f.write("2024-01-02 15:00:01,TRADE_OPEN_FAILED,insufficient buying power\n")
+    append_log("trade_system_log", {"Timestamp": "2024-01-03 15:00:00", "Action": "TRADE_CLOSE", "Details": "SELL 10 GLD"})
+    df = read_log("trade_system_log", ["Timestamp", "Action", "Details"])
+    assert list(df.columns) == ["Timestamp", "Action", "Details"]
+    assert list(df["Timestamp"]) == ["2024-01-02 15:00:00", "2024-01-02 15:00:01", "2024-01-03 15:00:00"]
+    assert list(df["Action"]) == ["TRADE_OPEN", "TRADE_OPEN_FAILED", "TRADE_CLOSE"]
+    assert list(df["Details"]) == ["BUY 10 GLD, SELL 20 GDX", "insufficient buying power", "SELL 10 GLD"]
+
+
+def test_legacy_csv_same_values_with_and_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("trade_system_log.csv", "w") as f:
+        f.write("2024-01-02 15:00:00,TRADE_OPEN,BUY 10 GLD, SELL 20 GDX\n")
+    with open("trade_log.csv", "w") as f:
+        f.write("2024-01-02 15:00:00,open,10,20,180.5,30.25\n")
+    sys_columns = ["Timestamp", "Action", "Details"]
+    with_arrow = {"sys": read_log("trade_system_log", sys_columns), "trade": read_log("trade_log", TRADE_COLUMNS)}
+    append_log("trade_log", trade("2024-01-03 15:00:00", "close"))
+    merged = read_log("trade_log", TRADE_COLUMNS)
+
+    monkeypatch.setattr(utils_log, "pa", None)
+    monkeypatch.setattr(utils_log, "pq", None)
+    without_arrow = {"sys": read_log("trade_system_log", sys_columns), "trade": read_log("trade_log", TRADE_COLUMNS)}
+
+    for key in with_arrow:
+        assert with_arrow[key].astype(object).values.tolist() == without_arrow[key].astype(object).values.tolist()
+    assert without_arrow["sys"]["Details"].tolist() == ["BUY 10 GLD, SELL 20 GDX"]
+    assert without_arrow["trade"]["Qty_GLD"].tolist() == [10]
+    # Legacy and parquet rows share arrow dtypes, so the merge does not fall back to object columns
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in merged.dtypes)
+    assert merged["Event"].tolist() == ["open", "close"]
@@ -0,0 +1,42 @@
+from utils_orders import fill_event, filled_quantities, submit_orders
+
+
+class FakeApi:
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.submitted = []
+
+    def submit_order(self, symbol, qty, side, type, time_in_force):
+        if symbol in self.reject:
+            raise RuntimeError(f"{symbol} rejected")
+        self.submitted.append((symbol, qty, side))
+
+
+ORDERS = [
+    dict(symbol="GLD", qty=10, side="buy"),
+    dict(symbol="GDX", qty=60, side="sell"),
+]
+
+
+def test_both_legs_filled():
+    api = FakeApi()
+    errors = submit_orders(api, ORDERS)
+    assert errors == [None, None]
+    assert sorted(api.submitted) == [("GDX", 60, "sell"), ("GLD", 10, "buy")]
+    filled = filled_quantities(ORDERS, errors)
+    assert filled == [10, 60]
+    assert fill_event("open", filled, [10, 60]) == "open"
+
+
+def test_one_sided_fill_is_partial():
+    api = FakeApi(reject={"GDX"})
+    errors = submit_orders(api, ORDERS)
+    assert errors[0] is None and isinstance(errors[1], RuntimeError)
+    filled = filled_quantities(ORDERS, errors)
+    assert filled == [10, 0]
+    assert fill_event("open", filled, [10, 60]) == "open_partial"
+
+
+def test_nothing_filled_logs_nothing():
+    errors = submit_orders(FakeApi(reject={"GLD", "GDX"}), ORDERS)
+    assert fill_event("close", filled_quantities(ORDERS, errors), [10, 60]) is None
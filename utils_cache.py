@@ -0,0 +1,74 @@
+"""
+Disk cache for yfinance downloads
+---------------------------------
+- Keys each download on (tickers, period, interval) and stores it as parquet under .cache/
+- Serves the cached frame while it is younger than the TTL, otherwise refetches
+- Never caches a failed or partial download (no rows, or an all-NaN Close/Volume column)
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+CACHE_DIR = ".cache"
+
+# Default TTLs (seconds) by bar interval
+DAILY_TTL = 24 * 60 * 60
+INTRADAY_TTL = 4 * 60 * 60
+
+
+def _default_ttl(interval):
+    return DAILY_TTL if interval in ("1d", "5d", "1wk", "1mo", "3mo") else INTRADAY_TTL
+
+
+def _cache_path(tickers, period, interval):
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    key = repr((sorted(tickers), period, interval)).encode()
+    return os.path.join(CACHE_DIR, f"yf_{hashlib.sha1(key).hexdigest()}.parquet")
+
+
+def _is_complete(df):
+    # A ticker that failed inside a multi-ticker download comes back as an all-NaN column
+    if df is None or df.empty:
+        return False
+    for field in ("Close", "Volume"):
+        if field in df and np.any(df[field].isna().all()):
+            return False
+    return True
+
+
+def _write_cache(df, path):
+    # Write under a per-writer temp name, then swap in atomically so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print("Failed to write yfinance cache:", e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_yf_download(tickers, period, interval="1d", ttl=None):
+    """yf.download with a parquet cache on disk; ttl is in seconds."""
+    if ttl is None:
+        ttl = _default_ttl(interval)
+    path = _cache_path(tickers, period, interval)
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print("Failed to read yfinance cache:", e)
+
+    df = yf.download(tickers, period=period, interval=interval)
+    if _is_complete(df):
+        _write_cache(df, path)
+    return df
@@ -0,0 +1,193 @@
+"""
+Rolling feature helpers
+-----------------------
+- Moving mean/std via bottleneck's O(N) kernels when it is installed
+- Falls back to pandas rolling windows otherwise (same min_periods and ddof)
+- compute_features builds the trader's signal/sizing features in one Numba pass
+- build_feature_frame turns a yf.download frame into the GLD/GDX feature frame both apps use
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# fastmath without 'nnan'/'ninf': the kernel relies on NaN checks for warm-up rows
+FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _all_nan(series):
+    return pd.Series(np.nan, index=series.index, dtype=np.float64)
+
+
+def rolling_mean(series, window):
+    if bn is None:
+        return series.rolling(window).mean()
+    values = series.to_numpy(dtype=np.float64)
+    # bottleneck rejects windows longer than the data; pandas just returns NaN
+    if len(values) < window:
+        return _all_nan(series)
+    return pd.Series(bn.move_mean(values, window, min_count=window), index=series.index)
+
+
+def rolling_std(series, window):
+    if bn is None:
+        return series.rolling(window).std()
+    values = series.to_numpy(dtype=np.float64)
+    if len(values) < window:
+        return _all_nan(series)
+    return pd.Series(bn.move_std(values, window, min_count=window, ddof=1), index=series.index)
+
+
+def rolling_mean_std(series, window):
+    """Rolling (mean, std) of one series, sharing a single pandas window in the fallback."""
+    if bn is None:
+        roll = series.rolling(window)
+        return roll.mean(), roll.std()
+    return rolling_mean(series, window), rolling_std(series, window)
+
+
+# --- Numba kernel ---
+# Each accumulator row holds a rolling Welford state: [count, mean, M2]
+def _push(acc, k, x):
+    if np.isnan(x):
+        return
+    acc[k, 0] += 1.0
+    delta = x - acc[k, 1]
+    acc[k, 1] += delta / acc[k, 0]
+    acc[k, 2] += delta * (x - acc[k, 1])
+
+
+def _pop(acc, k, x):
+    if np.isnan(x):
+        return
+    acc[k, 0] -= 1.0
+    if acc[k, 0] == 0.0:
+        acc[k, 1] = 0.0
+        acc[k, 2] = 0.0
+        return
+    delta = x - acc[k, 1]
+    acc[k, 1] -= delta / acc[k, 0]
+    acc[k, 2] = max(acc[k, 2] - delta * (x - acc[k, 1]), 0.0)
+
+
+def _std(acc, k):
+    return np.sqrt(acc[k, 2] / (acc[k, 0] - 1.0))
+
+
+def _features_loop(gld_close, gdx_close, gld_vol, lookback):
+    n = gld_close.shape[0]
+    gld_ret = np.full(n, np.nan)
+    gdx_ret = np.full(n, np.nan)
+    rvol = np.full(n, np.nan)
+    zscore = np.full(n, np.nan)
+    gld_volatility = np.full(n, np.nan)
+    gdx_volatility = np.full(n, np.nan)
+    # Rows: spread, GLD return, GDX return, GLD volume
+    acc = np.zeros((4, 3))
+    for i in range(n):
+        spread = gld_close[i] - gdx_close[i]
+        if i > 0:
+            gld_ret[i] = gld_close[i] / gld_close[i - 1] - 1.0
+            gdx_ret[i] = gdx_close[i] / gdx_close[i - 1] - 1.0
+        _push(acc, 0, spread)
+        _push(acc, 1, gld_ret[i])
+        _push(acc, 2, gdx_ret[i])
+        _push(acc, 3, gld_vol[i])
+        if i >= lookback:
+            j = i - lookback
+            _pop(acc, 0, gld_close[j] - gdx_close[j])
+            _pop(acc, 1, gld_ret[j])
+            _pop(acc, 2, gdx_ret[j])
+            _pop(acc, 3, gld_vol[j])
+        if acc[0, 0] == lookback:
+            zscore[i] = (spread - acc[0, 1]) / _std(acc, 0)
+        if acc[1, 0] == lookback:
+            gld_volatility[i] = _std(acc, 1)
+        if acc[2, 0] == lookback:
+            gdx_volatility[i] = _std(acc, 2)
+        if acc[3, 0] == lookback:
+            rvol[i] = gld_vol[i] / acc[3, 1]
+    return gld_ret, gdx_ret, rvol, zscore, gld_volatility, gdx_volatility
+
+
+if njit is not None:
+    # error_model="numpy": zero-variance/zero-volume windows give NaN/inf like pandas instead of raising
+    _jit = njit(cache=True, fastmath=FASTMATH_FLAGS, error_model="numpy")
+    _push = _jit(_push)
+    _pop = _jit(_pop)
+    _std = _jit(_std)
+    _compute_features = _jit(_features_loop)
+else:
+    _compute_features = None
+
+
+def _pct(a):
+    # pct_change without the shifted copy: one allocation and one vectorized divide
+    r = np.empty_like(a)
+    r[:1] = np.nan
+    np.divide(a[1:], a[:-1], out=r[1:])
+    r[1:] -= 1
+    return r
+
+
+def _compute_features_vectorized(gld_close, gdx_close, gld_vol, lookback):
+    vol = pd.Series(gld_vol)
+    spread = pd.Series(gld_close - gdx_close)
+    gld_ret = pd.Series(_pct(gld_close))
+    gdx_ret = pd.Series(_pct(gdx_close))
+    rvol = vol / rolling_mean(vol, lookback)
+    spread_mean, spread_std = rolling_mean_std(spread, lookback)
+    zscore = (spread - spread_mean) / spread_std
+    gld_volatility = rolling_std(gld_ret, lookback)
+    gdx_volatility = rolling_std(gdx_ret, lookback)
+    return tuple(s.to_numpy() for s in (gld_ret, gdx_ret, rvol, zscore, gld_volatility, gdx_volatility))
+
+
+def compute_features(gld_close, gdx_close, gld_vol, lookback):
+    """Return (GLD_ret, GDX_ret, RVOL, ZScore, GLD_volatility, GDX_volatility) arrays."""
+    gld_close = np.ascontiguousarray(gld_close, dtype=np.float64)
+    gdx_close = np.ascontiguousarray(gdx_close, dtype=np.float64)
+    gld_vol = np.ascontiguousarray(gld_vol, dtype=np.float64)
+    if _compute_features is None:
+        return _compute_features_vectorized(gld_close, gdx_close, gld_vol, lookback)
+    return _compute_features(gld_close, gdx_close, gld_vol, lookback)
+
+
+def price_frame(raw, gld_ticker, gdx_ticker):
+    """GLD/GDX close and volume columns from a multi-ticker yf.download frame, NaN rows dropped."""
+    return pd.concat({
+        'GLD': raw[('Close', gld_ticker)],
+        'GDX': raw[('Close', gdx_ticker)],
+        'GLD_vol': raw[('Volume', gld_ticker)],
+        'GDX_vol': raw[('Volume', gdx_ticker)],
+    }, axis=1).dropna()
+
+
+def add_features(df, lookback):
+    """Add the signal/sizing columns to a price_frame; rows still in the rolling warm-up are dropped."""
+    df = df.copy()
+    gld_ret, gdx_ret, rvol, zscore, gld_volatility, gdx_volatility = compute_features(
+        df['GLD'].to_numpy(), df['GDX'].to_numpy(), df['GLD_vol'].to_numpy(), lookback
+    )
+    df['GLD_ret'] = gld_ret
+    df['GDX_ret'] = gdx_ret
+    df['GLD_gap'] = df['GLD_ret']
+    df['RVOL'] = rvol
+    df['Spread'] = df['GLD'] - df['GDX']
+    df['ZScore'] = zscore
+    df['GLD_volatility'] = gld_volatility
+    df['GDX_volatility'] = gdx_volatility
+    return df.dropna()
+
+
+def build_feature_frame(raw, lookback, gld_ticker, gdx_ticker):
+    return add_features(price_frame(raw, gld_ticker, gdx_ticker), lookback)
@@ -0,0 +1,91 @@
+"""
+Append-only trade/system logs
+-----------------------------
+- Keeps one parquet file per day under <name>/date=YYYY-MM-DD/ when pyarrow is installed
+- Each row carries a monotonically increasing "seq" (time.time_ns) used to restore write order
+- Falls back to the original headerless <name>.csv files when pyarrow is missing
+- Rows in a legacy <name>.csv are still read, ahead of the parquet rows
+"""
+
+import os
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+SEQ_COLUMN = "seq"
+
+_write_lock = threading.Lock()
+_last_seq = 0
+
+
+def _next_seq():
+    global _last_seq
+    _last_seq = max(time.time_ns(), _last_seq + 1)
+    return _last_seq
+
+
+def append_log(name, row):
+    """Append one row (a dict keyed by column name) to the log called name."""
+    if pq is None:
+        with open(f"{name}.csv", "a") as f:
+            f.write(",".join(str(v) for v in row.values()) + "\n")
+        return
+
+    day_dir = os.path.join(name, f"date={str(row['Timestamp'])[:10]}")
+    path = os.path.join(day_dir, "part.parquet")
+    # pyarrow datasets skip "_"-prefixed files, so readers never see a half-written day
+    tmp_path = os.path.join(day_dir, "_part.parquet.tmp")
+    with _write_lock:
+        record = dict(row, **{SEQ_COLUMN: _next_seq()})
+        os.makedirs(day_dir, exist_ok=True)
+        if os.path.exists(path):
+            existing = pq.ParquetFile(path).read()
+            table = pa.concat_tables([existing, pa.Table.from_pylist([record], schema=existing.schema)])
+        else:
+            table = pa.Table.from_pylist([record])
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _read_legacy_csv(name, columns):
+    # Baseline logs were written unquoted, so Details can contain commas
+    # ("BUY 10 GLD, SELL 20 GDX"); split only at the first len(columns) - 1 commas.
+    rows = []
+    with open(f"{name}.csv") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line:
+                fields = line.split(",", len(columns) - 1)
+                rows.append(fields + [""] * (len(columns) - len(fields)))
+    df = pd.DataFrame(rows, columns=columns, dtype=object)
+    for col in columns[1:]:
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass
+    if pa is not None:
+        # Match the arrow-backed dtypes of the parquet rows so the concat keeps them
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    return df
+
+
+def read_log(name, columns):
+    """Return the log's columns, oldest row first."""
+    frames = []
+    if os.path.exists(f"{name}.csv"):
+        frames.append(_read_legacy_csv(name, columns))
+    if pq is not None and os.path.isdir(name):
+        table = pq.read_table(name, columns=columns + [SEQ_COLUMN])
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        frames.append(df.sort_values(SEQ_COLUMN, kind="stable").drop(columns=SEQ_COLUMN))
+    if not frames:
+        raise FileNotFoundError(f"No log found for {name}")
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,37 @@
+"""
+Concurrent order submission
+---------------------------
+- Sends every leg of a pair trade at once, one thread per leg
+- Each leg catches its own error, so one rejected leg does not hide the other
+- Helpers report what was actually filled, so a one-sided fill gets logged as such
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def submit_orders(api, orders):
+    """Submit market orders concurrently; returns one exception (or None) per order."""
+    def submit(order):
+        try:
+            api.submit_order(type="market", time_in_force="gtc", **order)
+            return None
+        except Exception as e:
+            return e
+    with ThreadPoolExecutor(max_workers=len(orders)) as ex:
+        return list(ex.map(submit, orders))
+
+
+def describe_order(order):
+    return f"{order['side'].upper()} {order['qty']} {order['symbol']}"
+
+
+def filled_quantities(orders, errors):
+    """Quantity accepted per leg: the order qty, or 0 where the leg failed."""
+    return [order["qty"] if err is None else 0 for order, err in zip(orders, errors)]
+
+
+def fill_event(event, filled, requested):
+    """event when every leg filled, event + "_partial" for a one-sided fill, None when nothing filled."""
+    if not any(filled):
+        return None
+    return event if list(filled) == list(requested) else f"{event}_partial"
@@ -0,0 +1,20 @@
+"""
+Streamlit threading helpers
+---------------------------
+- script_run_executor: a ThreadPoolExecutor whose workers inherit the calling script's run context
+- Lets st.cache_* and st.error/st.info work inside worker threads (e.g. overlapping Yahoo and Alpaca I/O)
+- Keeps the streamlit.runtime.scriptrunner import in one place
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+def script_run_executor(max_workers):
+    ctx = get_script_run_ctx()
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    )